@@ -1,112 +1,530 @@
+import asyncio
+import httpx
 import requests
-import json
-from python-dotenv import load_dotenv, dotenv_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import time
+from dataclasses import dataclass
+from dotenv import dotenv_values
 import logging
+import os
 from urllib.parse import urljoin
 
+# Fastest available JSON library, all of them accept bytes in loads()
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+# Parses the pages after the first one while they download, see _request_all_instances_async
+import ijson
+
+_CONFIG = dotenv_values(".env")  # take environment variables from .env, read once per process.
+# Change 'localhost' to the fully qualified domain name where the OpenAccess service is hosted
+API_URL = _CONFIG['API_URL']
+DEFAULT_PAGE_SIZE = int(_CONFIG['DEFAULT_PAGE_SIZE'])
+SUCCESS = _CONFIG['SUCCESS']
+ERROR = _CONFIG['ERROR']
+API_VERSION = _CONFIG['API_VERSION']
+APPLICATION_ID = _CONFIG['APPLICATION_ID']
+
+# Set OPENACCESS_DEBUG to see the debug output of every request. It is off by default because urllib3
+# formats a log record for each request, which costs more CPU than the request itself.
+if os.environ.get("OPENACCESS_DEBUG"):
+    logging.basicConfig(level=logging.DEBUG)
+    logging.getLogger("urllib3").setLevel(logging.DEBUG)
+
+def _retry_after(response):
+    # Seconds the server asked to wait with Retry-After, or with X-RateLimit-Reset once
+    # X-RateLimit-Remaining is exhausted. None if it did not say.
+    value = response.headers.get("Retry-After")
+    if value is None and response.headers.get("X-RateLimit-Remaining") == "0":
+        value = response.headers.get("X-RateLimit-Reset")
+
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    # Some servers send X-RateLimit-Reset as an epoch timestamp rather than a number of seconds
+    if seconds > 1e9:
+        seconds -= time.time()
+
+    return max(seconds, 0.0)
+
+class _RateLimiter:
+    """
+    Bounds the number of concurrent requests like a semaphore, and holds every request back
+    when a response says the server's rate limit has been reached
+    """
+
+    def __init__(self, concurrency):
+        self._sem = asyncio.Semaphore(concurrency)
+        self._resume_at = 0.0
+
+    async def __aenter__(self):
+        await self._sem.acquire()
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                # __aexit__ does not run when __aenter__ is cancelled, give the permit back here
+                self._sem.release()
+                raise
+
+    async def __aexit__(self, *exc_info):
+        self._sem.release()
+
+    def update(self, response):
+        delay = _retry_after(response)
+        if delay:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+@dataclass(slots=True)
+class Panel:
+    id: int
+    name: str
+    status: bool
+    type: int
+
+@dataclass(slots=True)
+class Reader:
+    panelId: int
+    id: int
+    name: str
+    type: int
+    hostName: str
+
 class OpenAccess:
-    config = dotenv_values(".env")  # take environment variables from .env.
+    config = _CONFIG
     # Constants and globals used throughout the class
-    instance = None
-    # Change 'localhost' to the fully qualified domain name where the OpenAccess service is hosted
-    API_URL = config['API_URL']
-    DEFAULT_PAGE_SIZE = config['DEFAULT_PAGE_SIZE']
-    SUCCESS = config['SUCCESS']
-    ERROR = config['ERROR']
-    API_VERSION = config['API_VERSION']
-    APPLICATION_ID = config['APPLICATION_ID']
+    _instance = None
+    API_URL = API_URL
+    DEFAULT_PAGE_SIZE = DEFAULT_PAGE_SIZE
+    SUCCESS = SUCCESS
+    ERROR = ERROR
+    API_VERSION = API_VERSION
+    APPLICATION_ID = APPLICATION_ID
+    # Limits applied to the concurrent page fetches. MAX_CONCURRENT_REQUESTS also caps the pages a
+    # paginated request streams at once.
+    MAX_CONCURRENT_REQUESTS = 32
+    MAX_CONNECTIONS_PER_HOST = 64
+    MAX_KEEPALIVE_CONNECTIONS = 32
+    # Seconds an "instances" page is served from the cache before it is revalidated with the server.
+    # Cached pages include live fields such as a panel's IsOnline, which can be this many seconds old.
+    CACHE_TTL_SECONDS = 30
+    # Cached "instances" pages, expired and then oldest pages are dropped when it is full
+    CACHE_MAX_SIZE = 512
+    # Page size used by retrieve_panels and retrieve_readers, large enough that most sites fit in one page
+    RETRIEVE_PAGE_SIZE = 500
+    # Bytes read from the socket at a time, and chunks downloaded ahead of the parser at most
+    STREAM_CHUNK_SIZE = 65536
+    MAX_QUEUED_CHUNKS = 64
+    # Attempts made for a request failing with a connection error, 429 or 502/503/504
+    MAX_RETRIES = 4
+    RETRY_BACKOFF_SECONDS = 0.2
+
+    def __new__(cls):
+        # Every OpenAccess() is the same object so the connection pool, cache and session token are shared
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
     def __init__(self):
+        # __init__ runs on every OpenAccess(), only the first call sets the instance up
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+
         # Set up the requests.Session to handle requests to the OpenAccess API
         self.base_url = self.API_URL
+        # Endpoint URLs, the query string of each request is built from a params dict by the HTTP client
+        self._urls = {name: urljoin(self.base_url, name) for name in ("instances", "cardholders", "authentication", "directories", "execute_method")}
         self.client = requests.Session()
         self.client.headers.clear()
         self.client.headers.update({
             "Application-Id": self.APPLICATION_ID,
             "Content-Type": "application/json",
-            "Accept": "application/json"
+            "Accept": "application/json",
+            "Connection": "keep-alive"
         })
+        # Keep a large pool of connections alive so repeated requests skip the TCP and TLS handshakes
+        adapter = HTTPAdapter(
+            pool_connections=self.MAX_CONNECTIONS_PER_HOST,
+            pool_maxsize=self.MAX_CONNECTIONS_PER_HOST,
+            # raise_on_status=False hands the last response back once the retries run out, so the callers' error branches still run
+            max_retries=Retry(
+                total=self.MAX_RETRIES - 1,
+                backoff_factor=self.RETRY_BACKOFF_SECONDS,
+                status_forcelist=[429, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self.client.mount("https://", adapter)
+        self.client.mount("http://", adapter)
         self.client.verify = False # Temporary solution for invalid security certificate causing an inability to access the api
         self.client.base_url = self.API_URL
         self.panels = []
-
-        # You must initialize logging, otherwise you'll not see debug output.
-        logging.basicConfig()
-        logging.getLogger().setLevel(logging.DEBUG)
-        requests_log = logging.getLogger("requests.packages.urllib3")
-        requests_log.setLevel(logging.DEBUG)
-        requests_log.propagate = True
-
-    @staticmethod
-    def instance():
-        if not OpenAccess._instance:
-            OpenAccess._instance = OpenAccess()
-        return OpenAccess._instance
-    
+        self._cache = {}  # (type, page_num, panel_id, page_size) -> (stored_at, etag, result)
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Pages are also parsed and cached from executor threads, see _request_all_instances_async
+        self._cache_lock = threading.Lock()
+        # Event loop and HTTP/2 client of the concurrent requests, started on first use, see _run
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._aclient = None
+
+    @classmethod
+    def instance(cls):
+        return cls()
 
     def parse_response(self, response):
-        return json.loads(response.content.decode('utf-8'))
-
-    def build_uri_with_version(self, method_name, version):
-        return "{}{}?version={}".format(self.base_url, method_name, version)
+        return _json.loads(response.content)
+
+    def _handle(self, response):
+        # Returns (ok, result): the parsed body on success, otherwise the status code and reason.
+        # Works with both requests and httpx responses, reading the raw body once and never response.text
+        body = response.content
+        if 200 <= response.status_code < 300:
+            return True, _json.loads(body) if body else {}
+
+        reason = getattr(response, "reason_phrase", None) or getattr(response, "reason", "")
+        return False, f"{response.status_code}: {reason}"
+
+    def build_instances_params(self, type, page_num, panel_id=-1, page_size=None):
+        # Query string of an "instances" request, encoded by the HTTP client
+        params = {
+            "version": "1.0",
+            "type_name": type,
+            "page_number": page_num,
+            "page_size": page_size or self.DEFAULT_PAGE_SIZE,
+            "order_by": "name"
+        }
 
-    def request_instances(self, type, page_num, panel_id=-1):
-        request = self.build_uri_with_version("instances", "1.0") + f"&type_name={type}&page_number={page_num}&page_size={self.DEFAULT_PAGE_SIZE}&order_by=name"
-        
         if panel_id != -1:
-            request += f"&filter=panelid = {panel_id}"
-    
+            params["filter"] = f"panelid = {panel_id}"
+
+        return params
+
+    def _cache_get(self, key):
+        # Returns (result, headers, stale): the cached result if it is still fresh, otherwise None, the
+        # headers needed to revalidate the stale entry with the server and that entry's (etag, result).
+        # Results are not copied, nothing in this class mutates a page once it is cached.
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._cache_misses += 1
+                return None, {}, None
+
+            stored_at, etag, result = entry
+            if time.monotonic() - stored_at < self.CACHE_TTL_SECONDS:
+                self._cache_hits += 1
+                return result, {}, None
+
+            self._cache_misses += 1
+            return None, {"If-None-Match": etag} if etag else {}, (etag, result)
+
+    def _cache_put(self, key, etag, result):
+        with self._cache_lock:
+            # Removing the key first keeps the dict ordered from the oldest to the newest write
+            self._cache.pop(key, None)
+            if len(self._cache) >= self.CACHE_MAX_SIZE:
+                self._cache_evict()
+            self._cache[key] = (time.monotonic(), etag, result)
+
+        return result
+
+    def _cache_evict(self):
+        # Called with _cache_lock held. Drops the expired pages, then the oldest ones if it is still full.
+        now = time.monotonic()
+        for key in [key for key, (stored_at, _, _) in self._cache.items() if now - stored_at >= self.CACHE_TTL_SECONDS]:
+            del self._cache[key]
+
+        while len(self._cache) >= self.CACHE_MAX_SIZE:
+            del self._cache[next(iter(self._cache))]
+
+    def _cache_revalidated(self, key, stale):
+        # The server answered 304 Not Modified, so the stale entry is valid for another TTL
+        etag, result = stale
+        return self._cache_put(key, etag, result)
+
+    def invalidate(self, type_name=None):
+        """
+        Drops the cached "instances" pages of type_name, or every cached page if type_name is None
+        """
+        with self._cache_lock:
+            if type_name is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == type_name]:
+                    del self._cache[key]
+
+    def cache_info(self):
+        with self._cache_lock:
+            return {"hits": self._cache_hits, "misses": self._cache_misses, "size": len(self._cache)}
+
+    def request_instances(self, type, page_num, panel_id=-1, page_size=None):
+        """
+        Returns one page of instances of type. The page is the cached object itself, shared with every
+        caller for up to CACHE_TTL_SECONDS, so it must be treated as read-only.
+
+        Like retrieve_panels, retrieve_readers and retrieve_all_readers (and their async versions), raises
+        requests.exceptions.HTTPError when the server answers with an error once the retries run out, and
+        requests.exceptions.ConnectionError when it cannot be reached.
+        """
+        key = (type, page_num, panel_id, page_size or self.DEFAULT_PAGE_SIZE)
+        result, headers, stale = self._cache_get(key)
+        if result is not None:
+            return result
+
         # OpenAccess "instances" request
         # GET /api/access/onguard/openaccess/instances
         # Retrieves instances of a particular type based on the client-supplied filter (above)
-        response = self.client.get(request)
-        
-        return self.parse_response(response)
+        response = self.client.get(self._urls["instances"], params=self.build_instances_params(type, page_num, panel_id, page_size), headers=headers)
+
+        if response.status_code == 304:
+            return self._cache_revalidated(key, stale)
+
+        response.raise_for_status()
+
+        return self._cache_put(key, response.headers.get("ETag"), self.parse_response(response))
+
+    def _get_loop(self):
+        # The async client is bound to the event loop that created it, so the instance owns one loop,
+        # running in a daemon thread for the life of the process, and every concurrent request runs on it
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="OpenAccess", daemon=True)
+                self._loop_thread.start()
+
+        return self._loop
+
+    def _run(self, coro):
+        # Runs coro on the instance's loop and blocks until it is done. Like the other synchronous methods
+        # this also works inside a running event loop, which is blocked meanwhile; async code should await
+        # the *_async methods instead.
+        loop = self._get_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("OpenAccess synchronous methods cannot be called from OpenAccess's own event loop")
+
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _run_async(self, coro):
+        # Awaits coro on the instance's loop from any event loop
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._get_loop()))
+
+    def _async_client(self):
+        # Called on the instance's loop. One client is kept for the life of the instance so its connections
+        # stay alive between calls, and HTTP/2 multiplexes the concurrent requests over a single connection
+        # when the server supports it. The headers are refreshed on every call to pick up the Session-Token,
+        # minus Connection which is not allowed in HTTP/2.
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                http2=True,
+                verify=False,
+                base_url=self.base_url,
+                limits=httpx.Limits(max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS, max_connections=self.MAX_CONNECTIONS_PER_HOST)
+            )
+
+        self._aclient.headers = {k: v for k, v in self.client.headers.items() if k.lower() != "connection"}
+        return self._aclient
+
+    def close(self):
+        """
+        Closes the connections of both HTTP clients and stops the event loop of the concurrent requests
+        """
+        if self._loop is not None:
+            if self._aclient is not None:
+                self._run(self._aclient.aclose())
+                self._aclient = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+        self.client.close()
+
+    async def _get_with_retry(self, client, limiter, url, stream=False, **kwargs):
+        # GET through the rate limiter, retrying with exponential backoff unless the server says how long to wait.
+        # With stream=True the body is left unread and the caller must close the response.
+        request = client.build_request("GET", url, **kwargs)
+        for attempt in range(self.MAX_RETRIES):
+            last_attempt = attempt == self.MAX_RETRIES - 1
+            backoff = self.RETRY_BACKOFF_SECONDS * 2 ** attempt
+            try:
+                async with limiter:
+                    response = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                # Raised as the requests exception the synchronous methods raise
+                if last_attempt:
+                    raise requests.exceptions.ConnectionError(f"{e} for url: {url}") from e
+                await asyncio.sleep(backoff)
+                continue
+
+            # Pauses every request sharing the limiter if the server asked for it
+            limiter.update(response)
+
+            if last_attempt or response.status_code not in (429, 502, 503, 504):
+                return response
+
+            await response.aclose()
+            if _retry_after(response) is None:
+                await asyncio.sleep(backoff)
+
+    def _raise_for_status(self, response):
+        # An error left after the retries, or any other failure, must not be parsed as a page. Raised as
+        # the same exception as response.raise_for_status() in request_instances.
+        if not response.is_success:
+            side = "Client" if response.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(f"{response.status_code} {side} Error: {response.reason_phrase} for url: {response.url}")
+
+    async def _request_instances_async(self, client, limiter, type, page_num, panel_id=-1, page_size=None):
+        # Same request as request_instances, rate limited so the server is not flooded
+        key = (type, page_num, panel_id, page_size or self.DEFAULT_PAGE_SIZE)
+        result, headers, stale = self._cache_get(key)
+        if result is not None:
+            return result
+
+        response = await self._get_with_retry(client, limiter, self._urls["instances"], params=self.build_instances_params(type, page_num, panel_id, page_size), headers=headers)
+
+        if response.status_code == 304:
+            return self._cache_revalidated(key, stale)
+
+        self._raise_for_status(response)
+
+        return self._cache_put(key, response.headers.get("ETag"), _json.loads(response.content))
+
+    async def _produce_page_async(self, client, limiter, queue, pending, type, page_num, panel_id, page_size):
+        # Streams one page to the consumer chunk by chunk, then an empty chunk to mark its end.
+        # The pending slot is taken before the download and released by the consumer at the end of the page.
+        await pending.acquire()
+        response = await self._get_with_retry(client, limiter, self._urls["instances"], stream=True, params=self.build_instances_params(type, page_num, panel_id, page_size))
+        try:
+            self._raise_for_status(response)
+            async for chunk in response.aiter_bytes(self.STREAM_CHUNK_SIZE):
+                await queue.put((page_num, chunk))
+        finally:
+            await response.aclose()
+
+        await queue.put((page_num, b""))
+
+    async def _produce_pages_async(self, client, limiter, queue, pending, type, page_nums, panel_id, page_size):
+        tasks = [
+            asyncio.ensure_future(self._produce_page_async(client, limiter, queue, pending, type, i, panel_id, page_size))
+            for i in page_nums
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Pages still waiting for a pending slot would never get one
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # Sentinel telling the consumer that no more pages are coming
+            await queue.put(None)
+
+    def _parse_chunk(self, parser, chunk, convert):
+        # Runs in a worker thread. Feeds one chunk of a page to its ijson parser, or closes the parser on
+        # the empty end chunk, and converts the items completed so far so the raw items can be dropped.
+        items, coro = parser
+        if chunk:
+            coro.send(chunk)
+        else:
+            coro.close()
+
+        converted = convert({"item_list": items})
+        del items[:]
+        return converted
+
+    async def _request_all_instances_async(self, client, limiter, type, convert, panel_id=-1, page_size=None):
+        # Request the first page to learn how many pages there are
+        result = await self._request_instances_async(client, limiter, type, 1, panel_id, page_size)
+
+        if result["count"] == 0:
+            return []
+
+        items = convert(result)
+
+        # Everything fit in the first page, no need for more round trips
+        if result["total_pages"] <= 1:
+            return items
+
+        # The remaining pages are downloaded concurrently and their bodies put on a bounded queue chunk by
+        # chunk, while a worker thread parses the chunks with ijson and converts the items as they complete.
+        # Only queued chunks and converted items are held in memory, never a whole page body or its raw
+        # items. These pages are not cached as they are never parsed whole.
+        page_nums = range(2, result["total_pages"] + 1)
+        queue = asyncio.Queue(maxsize=self.MAX_QUEUED_CHUNKS)
+        pending = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        producer = asyncio.ensure_future(self._produce_pages_async(client, limiter, queue, pending, type, page_nums, panel_id, page_size))
+        loop = asyncio.get_running_loop()
+        parsers = {page_num: None for page_num in page_nums}
+        pages = {page_num: [] for page_num in page_nums}
+        try:
+            while (entry := await queue.get()) is not None:
+                page_num, chunk = entry
+                if parsers[page_num] is None:
+                    parser_items = ijson.sendable_list()
+                    parsers[page_num] = (parser_items, ijson.items_coro(parser_items, "item_list.item", use_float=True))
+                pages[page_num].extend(await loop.run_in_executor(None, self._parse_chunk, parsers[page_num], chunk, convert))
+                if not chunk:
+                    parsers[page_num] = None
+                    pending.release()
+        except BaseException:
+            producer.cancel()
+            raise
+
+        # Re-raises the error of a failed download
+        await producer
+
+        # Pages arrive in completion order, put them back in page order
+        for i in page_nums:
+            items.extend(pages[i])
+
+        return items
 
     def get_panels_from_result(self, result):
-        panels = []
-        for jo in result['item_list']:
-            panels.append({
-                'id': jo['property_value_map']['ID'],
-                'name': jo['property_value_map']['Name'],
-                'status': jo['property_value_map']['IsOnline'] == True,
-                'type': jo['property_value_map']['PanelType']
-            })
-        return panels
+        return [Panel(
+            id=p['ID'],
+            name=p['Name'],
+            status=p['IsOnline'] is True,
+            type=p['PanelType']
+        ) for jo in result['item_list'] for p in (jo['property_value_map'],)]
 
     def get_readers_from_result(self, result):
-        readers = []
-        for jo in result['item_list']:
-            readers.append({
-                'panelId': jo['property_value_map']['PanelID'],
-                'id': jo['property_value_map']['ReaderID'],
-                'name': jo['property_value_map']['Name'],
-                'type': jo['property_value_map']['ControlType'],
-                'hostName': jo['property_value_map']['HostName']
-            })
-        return readers
+        return [Reader(
+            panelId=p['PanelID'],
+            id=p['ReaderID'],
+            name=p['Name'],
+            type=p['ControlType'],
+            hostName=p['HostName']
+        ) for jo in result['item_list'] for p in (jo['property_value_map'],)]
     
     def request_cardholder(self, autoload_badge=False, has_badges=False, cardholder_filter=None,badges_filter=None ):
-        # parameter = {
-        #     "auto_load_badge":True
-        # }
-
-        request = self.build_uri_with_version("cardholders", "1.2")
+        params = {"version": "1.2"}
 
         if autoload_badge:
-            request += f"&auto_load_badge=true"
-        
+            params["auto_load_badge"] = "true"
 
         if cardholder_filter is not None:
-            request += f"&cardholder_filter={cardholder_filter}"
+            params["cardholder_filter"] = cardholder_filter
     
         if badges_filter is not None:
-            request += f"&badges_filter={badges_filter}"
+            params["badges_filter"] = badges_filter
 
         # OpenAccess "cardholders" request
         # GET /api/access/onguard/openaccess/cardholders
         # Retrieves cardholders based on the client-supplied filter (above)
-        response = self.client.get(request)
+        response = self.client.get(self._urls["cardholders"], params=params)
         
         return self.parse_response(response)
     
@@ -123,32 +541,33 @@ class OpenAccess:
         # Create a User object to be serialized to JSON and sent as the payload in the POST request
         user = {"user_name": username, "password": password, "directory_id": directory_id}
         try:
-            url = self.build_uri_with_version("authentication","1.0")
-            print(url)
-            response = requests.post(url, json=user, verify = False, headers = self.client.headers)
+            response = self.client.post(self._urls["authentication"], params={"version": "1.0"}, data=_json.dumps(user))
         except requests.exceptions.RequestException as e:
             return f"Connection was unexpectedly closed. Make sure you don't have anything other than OpenAccess running on port 8080. Message: {e}"
 
         # If a response is received, parse it into a dictionary so its properties can be retrieved easily
-        if response.ok:
-            result = self.parse_response(response)
+        ok, result = self._handle(response)
+        if ok and "session_token" not in result:
+            ok, result = False, f"{response.status_code}: the response did not contain a session token"
+
+        if ok:
             self.session_token = result["session_token"]
             self.client.headers.update({"Session-Token": self.session_token})
+            # Cached pages were retrieved with the previous session's permissions
+            self.invalidate()
             return OpenAccess.SUCCESS
 
         # If an error occurred on the server side, return its information
         else:
-            return f"A server error occurred during your request. If the status code is available, it is shown below\n{response.status_code}: {response.reason}"
-        
+            return f"A server error occurred during your request. If the status code is available, it is shown below\n{result}"
 
     def get_directories(self):
-        response = self.client.get(self.build_uri_with_version("directories","1.0"))
+        response = self.client.get(self._urls["directories"], params={"version": "1.0"})
 
         # If a response is received, parse it into a dictionary so its properties can be retrieved easily
-        if response.status_code == 200:
+        ok, result = self._handle(response)
+        if ok:
             directories = []
-            result = json.loads(response.text)
-
             for directory in result['item_list']:
                 directories.append({
                     'Id': directory['property_value_map']['ID'],
@@ -159,62 +578,67 @@ class OpenAccess:
         else:
             return None
         
-    def retrieve_panels(self):
-        self.panels = []  # List to hold Panel objects to be displayed
-
-        # Request the first page of panels
-        result = self.request_instances("Lnl_Panel", 1)
-
-        pageCount = result['total_pages']  # Number of pages to iterate over.
-
-        # Convert the response to Panel objects and add them to the list
-        self.panels.extend(self.get_panels_from_result(result))
+    async def _retrieve_panels_on_loop(self, page_size):
+        limiter = _RateLimiter(self.MAX_CONCURRENT_REQUESTS)
+        self.panels = await self._request_all_instances_async(self._async_client(), limiter, "Lnl_Panel", self.get_panels_from_result, page_size=page_size)
+        return self.panels
 
-        # Make a GET request for each page of panels we need
-        for i in range(2, pageCount + 1):
-            # Request the appropriate page of Panels
-            result = self.request_instances("Lnl_Panel", i)
+    async def retrieve_panels_async(self, page_size=RETRIEVE_PAGE_SIZE):
+        return await self._run_async(self._retrieve_panels_on_loop(page_size))
 
-            # Convert the response to Panel objects and add them to the list
-            self.panels.extend(self.get_panels_from_result(result))
-
-        return self.panels
+    def retrieve_panels(self, page_size=RETRIEVE_PAGE_SIZE):
+        # Pages are fetched concurrently, see retrieve_panels_async. Pages come from the cache for up to
+        # CACHE_TTL_SECONDS, so a panel's status can lag that long behind; call invalidate("Lnl_Panel") first
+        # when the current online status is needed.
+        return self._run(self._retrieve_panels_on_loop(page_size))
 
     def get_panels(self):
         return self.panels
 
-    def retrieve_readers(self, panelId):
-        readers = [] # List to hold Reader objects to be displayed
+    async def _retrieve_readers_on_loop(self, panelId, page_size):
+        limiter = _RateLimiter(self.MAX_CONCURRENT_REQUESTS)
+        return await self._request_all_instances_async(self._async_client(), limiter, "Lnl_Reader", self.get_readers_from_result, panelId, page_size)
 
-        # Request the first page of readers for the specified panel
-        result = self.request_instances("Lnl_Reader", 1, panelId)
+    async def retrieve_readers_async(self, panelId, page_size=RETRIEVE_PAGE_SIZE):
+        return await self._run_async(self._retrieve_readers_on_loop(panelId, page_size))
 
-        if result["count"] == 0:
-            return readers
+    def retrieve_readers(self, panelId, page_size=RETRIEVE_PAGE_SIZE):
+        # Pages are fetched concurrently, see retrieve_readers_async
+        return self._run(self._retrieve_readers_on_loop(panelId, page_size))
 
-        pageCount = result["total_pages"] # Number of pages to iterate over.
+    async def _retrieve_readers_async(self, client, panel_sem, limiter, panelId, page_size):
+        async with panel_sem:
+            return await self._request_all_instances_async(client, limiter, "Lnl_Reader", self.get_readers_from_result, panelId, page_size)
 
-        # Convert the response to Reader objects and add them to the list
-        readers.extend(self.get_readers_from_result(result))
+    async def _retrieve_all_readers_on_loop(self, panels, page_size):
+        if panels is None:
+            panels = self.panels
 
-        # Make a GET request for each page of readers we need
-        for i in range(2, pageCount + 1):
-            # Request the appropriate page of readers for the specified Panel
-            result = self.request_instances("Lnl_Reader", i, panelId)
+        client = self._async_client()
+        panel_sem = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        limiter = _RateLimiter(self.MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(*[
+            self._retrieve_readers_async(client, panel_sem, limiter, panel.id, page_size)
+            for panel in panels
+        ])
 
-            # Convert the response to Reader objects and add them to the list
-            readers.extend(self.get_readers_from_result(result))
+        return {panel.id: readers for panel, readers in zip(panels, results)}
 
-        return readers
-    
-    def OpenDoor(self, reader):
+    async def retrieve_all_readers_async(self, panels=None, page_size=RETRIEVE_PAGE_SIZE):
         """
-        OpenAccess "execute_method" request
+        Retrieves the readers of every panel (the last retrieved panels by default) concurrently and
+        returns them in a dictionary keyed by panel id.
 
-        POST /api/access/onguard/openaccess/execute_method
-
-        Executes a supported method against a specific instance of a particular type (OpenDoor() against a reader in this case)
+        Panels and their pages share one client, whose connection limits cap the connections opened
+        to the OpenAccess server however many panels there are.
         """
+        return await self._run_async(self._retrieve_all_readers_on_loop(panels, page_size))
+
+    def retrieve_all_readers(self, panels=None, page_size=RETRIEVE_PAGE_SIZE):
+        # Panels are fetched concurrently, see retrieve_all_readers_async
+        return self._run(self._retrieve_all_readers_on_loop(panels, page_size))
+    
+    def _open_door_payload(self, reader):
         # Dictionary of identifying attributes
         prop_value = {
             "PanelID": str(reader.panelId), 
@@ -224,21 +648,77 @@ class OpenAccess:
         # Dictionary of method parameters (none)
         parameter_value = {}
 
-        # Data object to be serialized by PostAsJsonAsync
-        em = {
+        # Data object to be serialized as the JSON payload
+        return {
             "method_name":"OpenDoor", 
             "type_name":"Lnl_Reader", 
             "property_value_map":prop_value, 
             "in_parameter_value_map":parameter_value
         }
 
-        
-        response = self.client.post_json(self.build_uri_with_version("execute_method"), em)
-
-        # If a response is recieved, parse it into a dict so its properties can be retrieved easily
-        if response.status_code == 200:
+    def _open_door_status(self, response):
+        # If a response is recieved, the door was opened
+        ok, result = self._handle(response)
+        if ok:
             return self.SUCCESS
 
         # If an error occurred on the server side, return its information
         else:
-            return f"A server error occurred during your request. If the status code is available, it is shown below\n{response.status_code}: {response.text}"
+            return f"A server error occurred during your request. If the status code is available, it is shown below\n{result}"
+
+    async def _open_door_async(self, client, limiter, reader):
+        # The OpenDoor request of one reader in open_doors_async
+        async with limiter:
+            response = await client.post(self._urls["execute_method"], params={"version": "1.0"}, content=_json.dumps(self._open_door_payload(reader)))
+        limiter.update(response)
+
+        return self._open_door_status(response)
+
+    async def _open_doors_on_loop(self, readers):
+        client = self._async_client()
+        limiter = _RateLimiter(self.MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(*[self._open_door_async(client, limiter, reader) for reader in readers], return_exceptions=True)
+
+        statuses = []
+        for reader, result in zip(readers, results):
+            if isinstance(result, httpx.TransportError):
+                result = f"Connection was unexpectedly closed. Message: {result}"
+            elif isinstance(result, BaseException):
+                raise result
+            statuses.append((reader.id, result))
+
+        if any(status == self.SUCCESS for _, status in statuses):
+            self.invalidate("Lnl_Reader")
+
+        return statuses
+
+    async def open_doors_async(self, readers):
+        """
+        Opens the doors of all the readers concurrently with the OpenDoor request and returns a list of
+        (reader id, status) tuples, where status is SUCCESS or a description of the server or connection
+        error. Any other exception is raised.
+        """
+        return await self._run_async(self._open_doors_on_loop(readers))
+
+    def open_doors(self, readers):
+        # Doors are opened concurrently, see open_doors_async
+        return self._run(self._open_doors_on_loop(readers))
+
+    def OpenDoor(self, reader):
+        """
+        OpenAccess "execute_method" request
+
+        POST /api/access/onguard/openaccess/execute_method
+
+        Executes a supported method against a specific instance of a particular type (OpenDoor() against a reader in this case)
+        """
+        try:
+            response = self.client.post(self._urls["execute_method"], params={"version": "1.0"}, data=_json.dumps(self._open_door_payload(reader)))
+        except requests.exceptions.RequestException as e:
+            return f"Connection was unexpectedly closed. Message: {e}"
+
+        status = self._open_door_status(response)
+        if status == self.SUCCESS:
+            self.invalidate("Lnl_Reader")
+
+        return status
@@ -18,6 +18,8 @@ LONG_DESC_TYPE = "text/markdown"
 #Paquetes necesarios para que funcione la libreía. Se instalarán a la vez si no lo tuvieras ya instalado
 INSTALL_REQUIRES = [
       'requests',
+      'httpx[http2]',
+      'ijson',
       'json',
       'python-dotenv',
       'logging',
@@ -34,6 +36,7 @@ setup(
     author_email=AUTHOR_EMAIL,
     url=URL,
     install_requires=INSTALL_REQUIRES,
+    python_requires='>=3.10',
     license=LICENSE,
     packages=find_packages(),
     include_package_data=True